@@ -4,159 +4,380 @@ NSE India Symbol Fetcher
 Gets comprehensive list of NSE equity symbols for data collection
 """
 
+import asyncio
+import importlib.util
 import json
+import os
 import sys
-import requests
-import pandas as pd
-import yfinance as yf
-from typing import List, Dict
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional
+
+if TYPE_CHECKING:
+    import aiohttp
+
+try:
+    import orjson
+    
+    def dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+# Nifty 50 + Nifty Next 50 fallback list
+_NSE_BASE_SYMBOLS = (
+    # Nifty 50 - Top 50 stocks
+    "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "KOTAKBANK",
+    "BHARTIARTL", "ITC", "SBIN", "LT", "ASIANPAINT", "AXISBANK", "MARUTI", "HCLTECH",
+    "BAJFINANCE", "WIPRO", "ULTRACEMCO", "NESTLEIND", "ONGC", "TATAMOTORS", "SUNPHARMA",
+    "NTPC", "POWERGRID", "M&M", "TECHM", "TITAN", "COALINDIA", "INDUSINDBK", "ADANIPORTS",
+    "BAJAJFINSV", "HDFCLIFE", "SBILIFE", "BRITANNIA", "DIVISLAB", "DRREDDY", "EICHERMOT",
+    "BAJAJ-AUTO", "HEROMOTOCO", "HINDALCO", "CIPLA", "GRASIM", "TATASTEEL", "UPL",
+    "JSWSTEEL", "APOLLOHOSP", "TATACONSUM", "ADANIENT", "LTIM", "BPCL", "INDIGO",
+
+    # Nifty Next 50 - Additional important stocks
+    "ADANIGREEN", "ADANITRANS", "AMBUJACEM", "BANDHANBNK", "BERGEPAINT", "BIOCON",
+    "BOSCHLTD", "CANFINHOME", "CHOLAFIN", "COLPAL", "CONCOR", "COFORGE", "DABUR",
+    "DALBHARAT", "DEEPAKNTR", "DELTACORP", "DIXON", "DLF", "GAIL", "GODREJCP",
+    "GODREJPROP", "HAVELLS", "ICICIGI", "ICICIPRULI", "IDFCFIRSTB", "INDUSTOWER",
+    "IOC", "IRCTC", "JINDALSTEL", "JUBLFOOD", "LICHSGFIN", "LUPIN", "MARICO",
+    "MINDTREE", "MUTHOOTFIN", "NMDC", "NYKAA", "OBEROIRLTY", "OFSS", "PAGEIND",
+    "PETRONET", "PIDILITIND", "PIIND", "PNB", "POLICYBZR", "PVR", "RBLBANK",
+    "SAIL", "SHREECEM", "SIEMENS", "SRF", "TORNTPHARM", "TRENT", "TVSMOTOR",
+    "VOLTAS", "ZEEL", "ZOMATO", "MCDOWELL-N"
+)
+
+# NSE All Equity symbols (major ones), de-duplicated and sorted once at import
+_NSE_ALL_SYMBOLS = tuple(sorted({
+    # Banking & Financial Services
+    "HDFCBANK", "ICICIBANK", "SBIN", "KOTAKBANK", "AXISBANK", "INDUSINDBK",
+    "BANDHANBNK", "FEDERALBNK", "IDFCFIRSTB", "PNB", "BANKBARODA", "CANBK",
+    "UNIONBANK", "INDIANB", "RBLBANK", "YESBANK", "AUBANK", "EQUITASBNK",
+
+    # IT & Technology
+    "TCS", "INFY", "WIPRO", "HCLTECH", "TECHM", "LTIM", "MINDTREE", "COFORGE",
+    "MPHASIS", "PERSISTENT", "LTTS", "OFSS", "HEXAWARE", "CYIENT", "SONACOMS",
+
+    # Oil & Gas
+    "RELIANCE", "ONGC", "IOC", "BPCL", "HINDPETRO", "GAIL", "OIL", "MGL",
+    "IGL", "PETRONET", "GSPL", "ATGL",
+
+    # Automobiles
+    "MARUTI", "TATAMOTORS", "M&M", "BAJAJ-AUTO", "HEROMOTOCO", "EICHERMOT",
+    "TVSMOTOR", "ASHOKLEY", "BALKRISIND", "MRF", "APOLLOTYRE", "CEAT",
+
+    # Pharmaceuticals
+    "SUNPHARMA", "DRREDDY", "CIPLA", "DIVISLAB", "LUPIN", "BIOCON", "CADILAHC",
+    "AUROPHARMA", "TORNTPHARM", "GLENMARK", "ALKEM", "LALPATHLAB", "METROPOLIS",
+
+    # Consumer Goods
+    "HINDUNILVR", "ITC", "NESTLEIND", "BRITANNIA", "DABUR", "MARICO", "GODREJCP",
+    "COLPAL", "EMAMILTD", "BAJAJCON", "VBL", "RADICO", "UBL", "JUBLFOOD",
+
+    # Metals & Mining
+    "TATASTEEL", "JSWSTEEL", "HINDALCO", "VEDL", "COALINDIA", "NMDC", "SAIL",
+    "JINDALSTEL", "RATNAMANI", "WELCORP", "MOIL", "MANGALAM",
+
+    # Infrastructure & Construction
+    "LT", "ULTRACEMCO", "SHREECEM", "AMBUJACEM", "ACC", "RAMCOCEM", "HEIDELBERG",
+    "JKCEMENT", "ORIENTCEM", "PRISMCEM", "BANGALOREPO", "DLF", "OBEROIRLTY",
+    "PRESTIGE", "GODREJPROP", "BRIGADE", "SOBHA", "MAHLIFE",
+
+    # Power & Utilities
+    "NTPC", "POWERGRID", "ADANIGREEN", "ADANITRANS", "TATAPOWER", "NHPC",
+    "SJVN", "PFC", "RECLTD", "IREDA",
+
+    # Telecom
+    "BHARTIARTL", "INDUS", "GTPL", "TEJAS",
+
+    # Retail & E-commerce
+    "ZOMATO", "NYKAA", "POLICYBZR", "PAYTM", "TRENT", "ADITYADAYA", "WESTLIFE",
+    "JUBILANT", "SPENCERS", "SHOPERSTOP",
+
+    # Airlines & Travel
+    "INDIGO", "SPICEJET", "IRCTC",
+
+    # Entertainment & Media
+    "ZEEL", "SUNTV", "PVRINOX", "INOXLEISUR", "EROS", "BALAJITELE",
+
+    # Healthcare Services
+    "APOLLOHOSP", "FORTIS", "MAXHEALTH", "NARAYANAHEM", "RAINBOWHTN",
+
+    # Chemicals & Fertilizers
+    "UPL", "SRF", "PIDILITIND", "DEEPAKNTR", "TATACHEM", "BASF", "AKZOINDIA",
+    "NOCIL", "ALKYLAMINE", "CLEAN", "CAMS",
+
+    # Agriculture & Food Processing
+    "BRITANNIA", "GODREJAGRO", "RALLIS", "PI", "CHAMBLFERT", "COROMANDEL",
+
+    # Textiles
+    "GRASIM", "VARDHMAN", "RSWM", "TRIDENT", "WELSPUN", "PAGEIND",
+
+    # Diversified
+    "ADANIENT", "IPCALAB", "DIXON", "VOLTAS", "BLUEDART", "CONCOR"
+}))
+
+_NSE_POPULAR_SYMBOLS = (
+    "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "KOTAKBANK",
+    "BHARTIARTL", "ITC", "SBIN", "LT", "ASIANPAINT", "AXISBANK", "MARUTI", "HCLTECH",
+    "BAJFINANCE", "WIPRO", "ULTRACEMCO", "NESTLEIND", "ONGC", "TATAMOTORS", "SUNPHARMA",
+    "NTPC", "POWERGRID", "M&M", "TECHM", "TITAN", "COALINDIA", "INDUSINDBK", "ADANIPORTS"
+)
+
+# Validated symbol info (name/sector/industry) is near-static, so cache it on disk per symbol
+SYMBOL_CACHE_FILE = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'yobi' / 'nse_symbols.json'
+SYMBOL_CACHE_TTL = 7 * 24 * 60 * 60
+
+QUOTE_SUMMARY_URL = 'https://query2.finance.yahoo.com/v10/finance/quoteSummary/{symbol}'
+CRUMB_URL = 'https://query1.finance.yahoo.com/v1/test/getcrumb'
+# Only the quoteSummary modules validation needs (name, sector, industry)
+VALIDATE_MODULES = 'quoteType,assetProfile'
+
+# HTTP statuses worth retrying: rate limits and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+def http_status(exc: BaseException) -> Optional[int]:
+    """HTTP status of an aiohttp or curl_cffi error, if it carries one"""
+    status = getattr(exc, 'status', None)
+    if status is None:
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status
+
+def is_retryable(exc: BaseException) -> bool:
+    return http_status(exc) in RETRYABLE_STATUSES
+
+def yahoo_retry(retryable):
+    """Build a tenacity retry with jittered exponential backoff for Yahoo calls"""
+    # Imported here so the popular/all modes don't pay for it
+    from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+    
+    return retry(
+        wait=wait_random_exponential(multiplier=1, max=30),
+        stop=stop_after_attempt(4),
+        retry=retry_if_exception(retryable),
+        reraise=True
+    )
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls at least 1/rate seconds apart"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_call = 0.0
+    
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
 
 class NSESymbolFetcher:
-    def __init__(self):
-        self.base_symbols = [
-            # Nifty 50 - Top 50 stocks
-            "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "KOTAKBANK",
-            "BHARTIARTL", "ITC", "SBIN", "LT", "ASIANPAINT", "AXISBANK", "MARUTI", "HCLTECH",
-            "BAJFINANCE", "WIPRO", "ULTRACEMCO", "NESTLEIND", "ONGC", "TATAMOTORS", "SUNPHARMA",
-            "NTPC", "POWERGRID", "M&M", "TECHM", "TITAN", "COALINDIA", "INDUSINDBK", "ADANIPORTS",
-            "BAJAJFINSV", "HDFCLIFE", "SBILIFE", "BRITANNIA", "DIVISLAB", "DRREDDY", "EICHERMOT",
-            "BAJAJ-AUTO", "HEROMOTOCO", "HINDALCO", "CIPLA", "GRASIM", "TATASTEEL", "UPL",
-            "JSWSTEEL", "APOLLOHOSP", "TATACONSUM", "ADANIENT", "LTIM", "BPCL", "INDIGO",
-            
-            # Nifty Next 50 - Additional important stocks
-            "ADANIGREEN", "ADANITRANS", "AMBUJACEM", "BANDHANBNK", "BERGEPAINT", "BIOCON",
-            "BOSCHLTD", "CANFINHOME", "CHOLAFIN", "COLPAL", "CONCOR", "COFORGE", "DABUR",
-            "DALBHARAT", "DEEPAKNTR", "DELTACORP", "DIXON", "DLF", "GAIL", "GODREJCP",
-            "GODREJPROP", "HAVELLS", "ICICIGI", "ICICIPRULI", "IDFCFIRSTB", "INDUSTOWER",
-            "IOC", "IRCTC", "JINDALSTEL", "JUBLFOOD", "LICHSGFIN", "LUPIN", "MARICO",
-            "MINDTREE", "MUTHOOTFIN", "NMDC", "NYKAA", "OBEROIRLTY", "OFSS", "PAGEIND",
-            "PETRONET", "PIDILITIND", "PIIND", "PNB", "POLICYBZR", "PVR", "RBLBANK",
-            "SAIL", "SHREECEM", "SIEMENS", "SRF", "TORNTPHARM", "TRENT", "TVSMOTOR",
-            "VOLTAS", "ZEEL", "ZOMATO", "MCDOWELL-N"
-        ]
+    def __init__(self, max_concurrency: int = 20, max_workers: int = 16, requests_per_second: float = 5.0,
+                 cache_file: Optional[Path] = SYMBOL_CACHE_FILE, cache_ttl: int = SYMBOL_CACHE_TTL):
+        self.max_concurrency = max_concurrency
+        self.cache_file = cache_file
+        self.cache_ttl = cache_ttl
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self._thread_local = threading.local()
+        self.base_symbols = list(_NSE_BASE_SYMBOLS)
     
     def get_nse_symbols_from_file(self) -> List[str]:
         """Get NSE symbols from a comprehensive list"""
-        try:
-            # NSE All Equity symbols (major ones)
-            nse_symbols = [
-                # Banking & Financial Services
-                "HDFCBANK", "ICICIBANK", "SBIN", "KOTAKBANK", "AXISBANK", "INDUSINDBK",
-                "BANDHANBNK", "FEDERALBNK", "IDFCFIRSTB", "PNB", "BANKBARODA", "CANBK",
-                "UNIONBANK", "INDIANB", "RBLBANK", "YESBANK", "AUBANK", "EQUITASBNK",
-                
-                # IT & Technology
-                "TCS", "INFY", "WIPRO", "HCLTECH", "TECHM", "LTIM", "MINDTREE", "COFORGE",
-                "MPHASIS", "PERSISTENT", "LTTS", "OFSS", "HEXAWARE", "CYIENT", "SONACOMS",
-                
-                # Oil & Gas
-                "RELIANCE", "ONGC", "IOC", "BPCL", "HINDPETRO", "GAIL", "OIL", "MGL",
-                "IGL", "PETRONET", "GSPL", "ATGL",
-                
-                # Automobiles
-                "MARUTI", "TATAMOTORS", "M&M", "BAJAJ-AUTO", "HEROMOTOCO", "EICHERMOT",
-                "TVSMOTOR", "ASHOKLEY", "BALKRISIND", "MRF", "APOLLOTYRE", "CEAT",
-                
-                # Pharmaceuticals
-                "SUNPHARMA", "DRREDDY", "CIPLA", "DIVISLAB", "LUPIN", "BIOCON", "CADILAHC",
-                "AUROPHARMA", "TORNTPHARM", "GLENMARK", "ALKEM", "LALPATHLAB", "METROPOLIS",
-                
-                # Consumer Goods
-                "HINDUNILVR", "ITC", "NESTLEIND", "BRITANNIA", "DABUR", "MARICO", "GODREJCP",
-                "COLPAL", "EMAMILTD", "BAJAJCON", "VBL", "RADICO", "UBL", "JUBLFOOD",
-                
-                # Metals & Mining
-                "TATASTEEL", "JSWSTEEL", "HINDALCO", "VEDL", "COALINDIA", "NMDC", "SAIL",
-                "JINDALSTEL", "RATNAMANI", "WELCORP", "MOIL", "MANGALAM",
-                
-                # Infrastructure & Construction
-                "LT", "ULTRACEMCO", "SHREECEM", "AMBUJACEM", "ACC", "RAMCOCEM", "HEIDELBERG",
-                "JKCEMENT", "ORIENTCEM", "PRISMCEM", "BANGALOREPO", "DLF", "OBEROIRLTY",
-                "PRESTIGE", "GODREJPROP", "BRIGADE", "SOBHA", "MAHLIFE",
-                
-                # Power & Utilities
-                "NTPC", "POWERGRID", "ADANIGREEN", "ADANITRANS", "TATAPOWER", "NHPC",
-                "SJVN", "PFC", "RECLTD", "IREDA",
-                
-                # Telecom
-                "BHARTIARTL", "INDUS", "GTPL", "TEJAS",
-                
-                # Retail & E-commerce
-                "ZOMATO", "NYKAA", "POLICYBZR", "PAYTM", "TRENT", "ADITYADAYA", "WESTLIFE",
-                "JUBILANT", "SPENCERS", "SHOPERSTOP",
-                
-                # Airlines & Travel
-                "INDIGO", "SPICEJET", "IRCTC",
-                
-                # Entertainment & Media
-                "ZEEL", "SUNTV", "PVRINOX", "INOXLEISUR", "EROS", "BALAJITELE",
-                
-                # Healthcare Services
-                "APOLLOHOSP", "FORTIS", "MAXHEALTH", "NARAYANAHEM", "RAINBOWHTN",
-                
-                # Chemicals & Fertilizers
-                "UPL", "SRF", "PIDILITIND", "DEEPAKNTR", "TATACHEM", "BASF", "AKZOINDIA",
-                "NOCIL", "ALKYLAMINE", "CLEAN", "CAMS",
-                
-                # Agriculture & Food Processing
-                "BRITANNIA", "GODREJAGRO", "RALLIS", "PI", "CHAMBLFERT", "COROMANDEL",
-                
-                # Textiles
-                "GRASIM", "VARDHMAN", "RSWM", "TRIDENT", "WELSPUN", "PAGEIND",
-                
-                # Diversified
-                "ADANIENT", "IPCALAB", "DIXON", "VOLTAS", "BLUEDART", "CONCOR"
-            ]
-            
-            return sorted(list(set(nse_symbols)))  # Remove duplicates and sort
+        return list(_NSE_ALL_SYMBOLS)
+    
+    async def _get_crumb(self, session: "aiohttp.ClientSession") -> str:
+        """Get the crumb Yahoo requires alongside its session cookie"""
+        # fc.yahoo.com sets the cookie the crumb is bound to
+        async with session.get('https://fc.yahoo.com'):
+            pass
+        async with session.get(CRUMB_URL) as r:
+            r.raise_for_status()
+            return (await r.text()).strip()
+    
+    async def _fetch_info(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                          crumb: str, symbol: str) -> Dict:
+        """Fetch quoteType/assetProfile modules for a single NSE symbol"""
+        url = QUOTE_SUMMARY_URL.format(symbol=f"{symbol}.NS")
+        
+        async with semaphore:
+            async with session.get(url, params={'modules': VALIDATE_MODULES, 'crumb': crumb}) as r:
+                r.raise_for_status()
+                data = await r.json()
+        
+        return self._parse_quote_summary(symbol, data)
+    
+    def _parse_quote_summary(self, symbol: str, data: Dict) -> Dict:
+        """Build an instrument record from a quoteType/assetProfile quoteSummary response"""
+        results = (data.get('quoteSummary') or {}).get('result') or []
+        if not results:
+            return {}
+        
+        info = {**(results[0].get('assetProfile') or {}), **(results[0].get('quoteType') or {})}
+        return self._build_instrument(symbol, info)
+    
+    def _build_instrument(self, symbol: str, info: Dict) -> Dict:
+        """Turn Yahoo info fields into an instrument record, or {} if Yahoo doesn't know the symbol"""
+        if 'symbol' not in info and 'shortName' not in info:
+            return {}
+        
+        return {
+            'symbol': symbol,
+            'yahoo_symbol': f"{symbol}.NS",
+            'name': info.get('shortName') or info.get('longName') or symbol,
+            'sector': info.get('sector', 'Unknown'),
+            'industry': info.get('industry', 'Unknown'),
+            'currency': info.get('currency', 'INR'),
+            'exchange': 'NSE',
+            'country': 'India'
+        }
+    
+    async def _validate_symbols_async(self, symbols: List[str]) -> List[Dict]:
+        """Fire all quoteSummary requests concurrently over one pooled session"""
+        # Imported here so the popular/all modes don't pay for it
+        import aiohttp
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300)
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            crumb = await yahoo_retry(is_retryable)(self._get_crumb)(session)
+            fetch_info = yahoo_retry(is_retryable)(self._fetch_info)
+            results = await asyncio.gather(
+                *[fetch_info(session, semaphore, crumb, symbol) for symbol in symbols],
+                return_exceptions=True
+            )
+        
+        validated_symbols = []
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"Failed to validate {symbol}: {result}")
+            elif result:
+                validated_symbols.append(result)
+        return validated_symbols
+    
+    def _thread_session(self):
+        """Per-thread curl_cffi session with its own Yahoo cookie and crumb"""
+        local = self._thread_local
+        if not hasattr(local, 'session'):
+            # Imported here so the popular/all modes don't pay for it
+            from curl_cffi import requests as cffi_requests
             
+            session = cffi_requests.Session(impersonate='chrome')
+            # fc.yahoo.com sets the cookie the crumb is bound to
+            session.get('https://fc.yahoo.com', allow_redirects=True)
+            r = session.get(CRUMB_URL)
+            r.raise_for_status()
+            local.session, local.crumb = session, r.text.strip()
+        return local.session, local.crumb
+    
+    def _fetch_info_sync(self, symbol: str) -> Dict:
+        """Fetch quoteType/assetProfile modules for a single NSE symbol (thread-pool path)"""
+        # Every attempt, including retries, goes through the shared rate limiter
+        self.rate_limiter.wait()
+        session, crumb = self._thread_session()
+        r = session.get(QUOTE_SUMMARY_URL.format(symbol=f"{symbol}.NS"),
+                        params={'modules': VALIDATE_MODULES, 'crumb': crumb})
+        r.raise_for_status()
+        return self._parse_quote_summary(symbol, r.json())
+    
+    def _validate_one(self, fetch_info: Callable[[str], Dict], symbol: str) -> Dict:
+        """Validate a single symbol, logging and skipping it on failure"""
+        try:
+            return fetch_info(symbol)
         except Exception as e:
-            print(f"Error getting NSE symbols: {e}")
-            return self.base_symbols
+            print(f"Failed to validate {symbol}: {e}")
+            return {}
+    
+    def _validate_symbols_threaded(self, symbols: List[str]) -> List[Dict]:
+        """Synchronous fallback: run quoteSummary lookups in a thread pool (HTTP I/O releases the GIL)"""
+        fetch_info = yahoo_retry(is_retryable)(self._fetch_info_sync)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(lambda symbol: self._validate_one(fetch_info, symbol), symbols)
+            return [result for result in results if result]
+    
+    def _load_symbol_cache(self) -> Dict[str, Dict]:
+        """Load the on-disk {symbol: {info, fetched_at}} cache, or {} if missing/unreadable"""
+        if self.cache_file is None:
+            return {}
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        # Drop malformed entries so a corrupted cache behaves like a cache miss
+        return {
+            symbol: entry for symbol, entry in data.items()
+            if isinstance(entry, dict)
+            and isinstance(entry.get('info'), dict)
+            and isinstance(entry.get('fetched_at'), (int, float))
+            and not isinstance(entry.get('fetched_at'), bool)
+        }
+    
+    def _save_symbol_cache(self, cache: Dict[str, Dict]):
+        """Write the cache atomically so a concurrent reader never sees a partial file"""
+        if self.cache_file is None:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temp file so concurrent runs don't clobber each other's writes
+            with tempfile.NamedTemporaryFile('w', dir=self.cache_file.parent, prefix=self.cache_file.name + '.',
+                                             suffix='.tmp', delete=False) as f:
+                json.dump(cache, f)
+            try:
+                os.replace(f.name, self.cache_file)
+            except OSError:
+                os.unlink(f.name)
+                raise
+        except OSError as e:
+            print(f"Failed to write symbol cache: {e}")
     
     def validate_symbols(self, symbols: List[str]) -> List[Dict]:
-        """Validate symbols with yfinance and get basic info"""
-        validated_symbols = []
-        
+        """Validate symbols against Yahoo and get basic info (cached on disk per symbol)"""
         print(f"Validating {len(symbols)} NSE symbols...")
         
-        for i, symbol in enumerate(symbols):
+        cache = self._load_symbol_cache()
+        cutoff = time.time() - self.cache_ttl
+        stale = [symbol for symbol in symbols
+                 if symbol not in cache or cache[symbol].get('fetched_at', 0) < cutoff]
+        
+        if stale:
             try:
-                # Add .NS suffix for NSE
-                yahoo_symbol = f"{symbol}.NS"
-                ticker = yf.Ticker(yahoo_symbol)
-                info = ticker.info
-                
-                if 'symbol' in info or 'shortName' in info:
-                    validated_symbols.append({
-                        'symbol': symbol,
-                        'yahoo_symbol': yahoo_symbol,
-                        'name': info.get('shortName', info.get('longName', symbol)),
-                        'sector': info.get('sector', 'Unknown'),
-                        'industry': info.get('industry', 'Unknown'),
-                        'currency': info.get('currency', 'INR'),
-                        'exchange': 'NSE',
-                        'country': 'India'
-                    })
-                    
-                if (i + 1) % 20 == 0:
-                    print(f"Validated {i + 1}/{len(symbols)} symbols...")
-                    
+                if importlib.util.find_spec('aiohttp') is not None:
+                    fetched = asyncio.run(self._validate_symbols_async(stale))
+                else:
+                    fetched = self._validate_symbols_threaded(stale)
             except Exception as e:
-                print(f"Failed to validate {symbol}: {e}")
-                continue
+                # e.g. the crumb handshake failed - fall back to whatever is cached
+                print(f"Failed to refresh {len(stale)} symbols: {e}")
+                fetched = []
+            
+            now = time.time()
+            for instrument in fetched:
+                cache[instrument['symbol']] = {'info': instrument, 'fetched_at': now}
+            if fetched:
+                self._save_symbol_cache(cache)
+        
+        # Entries whose refresh failed fall back to their stale cached info rather than vanishing
+        validated_symbols = [cache[symbol]['info'] for symbol in symbols if symbol in cache]
         
-        print(f"Successfully validated {len(validated_symbols)} symbols out of {len(symbols)}")
+        print(f"Successfully validated {len(validated_symbols)} symbols out of {len(symbols)} "
+              f"({len(symbols) - len(stale)} from cache)")
         return validated_symbols
     
     def get_popular_nse_symbols(self) -> List[str]:
         """Get just the most popular NSE symbols for quick testing"""
-        return [
-            "RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR", "ICICIBANK", "KOTAKBANK",
-            "BHARTIARTL", "ITC", "SBIN", "LT", "ASIANPAINT", "AXISBANK", "MARUTI", "HCLTECH",
-            "BAJFINANCE", "WIPRO", "ULTRACEMCO", "NESTLEIND", "ONGC", "TATAMOTORS", "SUNPHARMA",
-            "NTPC", "POWERGRID", "M&M", "TECHM", "TITAN", "COALINDIA", "INDUSINDBK", "ADANIPORTS"
-        ]
+        return list(_NSE_POPULAR_SYMBOLS)
 
 def main():
     import argparse
@@ -195,7 +416,7 @@ def main():
             "instruments": validated
         }
     
-    print(json.dumps(result, indent=2))
+    print(dumps(result))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -7,44 +7,252 @@ Called by the Node.js data collector service
 
 import yfinance as yf
 import json
+import os
 import sys
+import threading
+import time
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from curl_cffi import requests as cffi_requests
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+from yfinance.exceptions import YFRateLimitError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
 import argparse
 
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import orjson
+    
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to JSON with orjson (handles NumPy scalars and datetimes natively)"""
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode()
+    
+    loads = orjson.loads
+except ImportError:
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize to JSON with the standard library"""
+        return json.dumps(obj, indent=2 if indent else None, default=str)
+    
+    loads = json.loads
+
+def utc_now_iso() -> str:
+    """Current time as an ISO-8601 UTC string with a trailing Z"""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+# Cache TTLs (seconds) per endpoint: short for quotes, normal for history, long for fundamentals
+QUOTE_TTL = 5
+HISTORICAL_TTL = 60 * 60
+FUNDAMENTALS_TTL = 24 * 60 * 60
+# How long the last good response is kept as a fallback when Yahoo errors or rate-limits
+STALE_TTL = 7 * 24 * 60 * 60
+# How long to bypass Redis after a connection error before trying it again
+REDIS_RETRY_AFTER = 30
+
+QUOTE_SUMMARY_URL = "https://query2.finance.yahoo.com/v10/finance/quoteSummary/{symbol}"
+QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+# Max symbols Yahoo's v7 quote endpoint accepts in a single request
+QUOTE_BATCH_SIZE = 200
+# quoteSummary modules actually needed per endpoint, instead of everything .info pulls in
+QUOTE_MODULES = "price"
+FUNDAMENTALS_MODULES = "summaryDetail,defaultKeyStatistics,financialData,summaryProfile"
+
+# Serializes yfinance calls across daemon threads (see _get_history)
+YFINANCE_LOCK = threading.Lock()
+
+# HTTP statuses worth retrying: rate limits and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits and transient HTTP errors are retried; 4xx like 400/401/404 are permanent"""
+    if isinstance(exc, YFRateLimitError):
+        return True
+    if isinstance(exc, cffi_requests.exceptions.HTTPError):
+        return getattr(getattr(exc, "response", None), "status_code", None) in RETRYABLE_STATUSES
+    return False
+
+# Retry with jittered exponential backoff instead of failing the request
+# (or a whole batch entry) on the first transient error
+yahoo_retry = retry(
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(4),
+    retry=retry_if_exception(is_retryable),
+    reraise=True
+)
+
 class YFinanceCollector:
     def __init__(self):
-        self.session = None
+        # Shared browser-impersonating session: reuses connections and Yahoo's cookie/crumb
+        # across calls and avoids most of the 429s a plain requests session gets
+        self.session = cffi_requests.Session(impersonate="chrome")
+        self._crumb = None
+        
+        # Redis caching is opt-in via REDIS_URL so one-shot CLI runs without Redis
+        # don't pay a connection timeout on every call
+        redis_url = os.environ.get("REDIS_URL")
+        self.cache = None
+        if redis is not None and redis_url:
+            self.cache = redis.Redis.from_url(redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        self._cache_retry_at = 0.0
+    
+    def _cache_available(self) -> bool:
+        return self.cache is not None and time.monotonic() >= self._cache_retry_at
+    
+    def _cache_failed(self):
+        # Redis unavailable - skip it for a while, then try again
+        self._cache_retry_at = time.monotonic() + REDIS_RETRY_AFTER
+    
+    def _cached(self, key: str, stale_key: str, ttl: int, fn: Callable[[], Any]) -> Any:
+        """Return a cached response for key, or compute it with fn and cache it.
+        
+        Successful responses are also stored under stale_key so that a later
+        Yahoo failure (e.g. HTTP 429) can fall back to the last good value.
+        """
+        if self._cache_available():
+            try:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return loads(cached)
+            except redis.RedisError:
+                self._cache_failed()
+        
+        result = fn()
+        
+        if isinstance(result, dict) and "error" in result:
+            if self._cache_available():
+                try:
+                    stale = self.cache.get(stale_key)
+                    if stale is not None:
+                        return loads(stale)
+                except redis.RedisError:
+                    self._cache_failed()
+            return result
+        
+        if self._cache_available():
+            try:
+                payload = dumps(result)
+                pipe = self.cache.pipeline()
+                pipe.setex(key, ttl, payload)
+                pipe.setex(stale_key, STALE_TTL, payload)
+                pipe.execute()
+            except redis.RedisError:
+                self._cache_failed()
+        
+        return result
     
     def get_quote(self, symbol: str) -> Dict[str, Any]:
-        """Get real-time quote for a single symbol"""
+        """Get real-time quote for a single symbol (cached for a few seconds)"""
+        bucket = int(time.time() / QUOTE_TTL)
+        return self._cached(f"yf:quote:{symbol}:{bucket}", f"yf:quote:{symbol}:last",
+                            QUOTE_TTL, lambda: self._fetch_quote(symbol))
+    
+    def get_historical_data(self, symbol: str, period: str = "1y") -> Dict[str, Any]:
+        """Get historical data for a symbol (cached for an hour)"""
+        bucket = int(time.time() / HISTORICAL_TTL)
+        return self._cached(f"yf:hist:{symbol}:{period}:{bucket}", f"yf:hist:{symbol}:{period}:last",
+                            HISTORICAL_TTL, lambda: self._fetch_historical_data(symbol, period))
+    
+    def get_company_info(self, symbol: str) -> Dict[str, Any]:
+        """Get fundamental company information (cached for a day)"""
+        return self._cached(f"yf:fund:{symbol}:{date.today()}", f"yf:fund:{symbol}:last",
+                            FUNDAMENTALS_TTL, lambda: self._fetch_company_info(symbol))
+    
+    def _get_crumb(self, refresh: bool = False) -> str:
+        """Get (and remember) the crumb Yahoo requires alongside its session cookie"""
+        if self._crumb is None or refresh:
+            # fc.yahoo.com sets the cookie the crumb is bound to
+            self.session.get("https://fc.yahoo.com", allow_redirects=True)
+            r = self.session.get(CRUMB_URL)
+            r.raise_for_status()
+            self._crumb = r.text.strip()
+        return self._crumb
+    
+    def _yahoo_get(self, url: str, params: Dict[str, Any]) -> cffi_requests.Response:
+        """GET a crumb-protected Yahoo endpoint on the pooled session"""
+        r = self.session.get(url, params={**params, "crumb": self._get_crumb()})
+        if r.status_code == 401:
+            # Crumb expired - fetch a fresh one and try once more
+            r = self.session.get(url, params={**params, "crumb": self._get_crumb(refresh=True)})
+        if r.status_code == 429:
+            raise YFRateLimitError()
+        return r
+    
+    @yahoo_retry
+    def _quote_batch(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """Fetch v7 quotes for up to QUOTE_BATCH_SIZE symbols in one request"""
+        r = self._yahoo_get(QUOTE_URL, {"symbols": ",".join(symbols)})
+        r.raise_for_status()
+        return (r.json().get("quoteResponse") or {}).get("result") or []
+    
+    @yahoo_retry
+    def _quote_summary(self, symbol: str, modules: str) -> Dict[str, Any]:
+        """Fetch only the given quoteSummary modules, flattened into an .info-style dict"""
+        r = self._yahoo_get(QUOTE_SUMMARY_URL.format(symbol=symbol), {"modules": modules})
+        if r.status_code == 404:
+            raise ValueError(f"No data found for {symbol}")
+        r.raise_for_status()
+        
+        result = (r.json().get("quoteSummary") or {}).get("result") or []
+        info = {}
+        for module in (result[0].values() if result else []):
+            if not isinstance(module, dict):
+                continue
+            for key, value in module.items():
+                if isinstance(value, dict):
+                    # {"raw": 1.23, "fmt": "1.23"} -> 1.23, {} -> None
+                    value = value.get("raw")
+                info.setdefault(key, value)
+        return info
+    
+    @yahoo_retry
+    def _get_history(self, symbol: str, period: str) -> pd.DataFrame:
+        # yfinance keeps one process-wide session that yf.Ticker(session=...) swaps out,
+        # so daemon worker threads must not run yfinance calls concurrently
+        with YFINANCE_LOCK:
+            return yf.Ticker(symbol, session=self.session).history(period=period)
+    
+    def _build_quote(self, symbol: str, hist: pd.DataFrame, timestamp: str) -> Dict[str, Any]:
+        """Build a quote dict from the last two rows of daily history"""
+        latest = hist.iloc[-1]
+        previous = hist.iloc[-2] if len(hist) >= 2 else latest
+        
+        close = float(latest["Close"])
+        prev_close = float(previous["Close"])
+        delta = close - prev_close
+        volume = latest["Volume"]
+        
+        return {
+            "symbol": symbol.upper(),
+            "price": close,
+            "change": delta,
+            "changePercent": delta / prev_close * 100.0 if prev_close else 0.0,
+            "volume": int(volume) if not pd.isna(volume) else 0,
+            "high": float(latest["High"]),
+            "low": float(latest["Low"]),
+            "open": float(latest["Open"]),
+            "previousClose": prev_close,
+            "timestamp": timestamp,
+            "source": "yfinance"
+        }
+    
+    def _fetch_quote(self, symbol: str) -> Dict[str, Any]:
+        """Fetch real-time quote for a single symbol from Yahoo"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            hist = ticker.history(period="2d")  # Get last 2 days for previous close
+            info = self._quote_summary(symbol, QUOTE_MODULES)
+            hist = self._get_history(symbol, "2d")  # Get last 2 days for previous close
             
             if hist.empty:
                 raise ValueError(f"No data found for {symbol}")
             
-            latest = hist.iloc[-1]
-            previous = hist.iloc[-2] if len(hist) >= 2 else latest
-            
-            quote = {
-                "symbol": symbol.upper(),
-                "name": info.get("longName", info.get("shortName", symbol)),
-                "price": float(latest["Close"]),
-                "change": float(latest["Close"] - previous["Close"]),
-                "changePercent": float((latest["Close"] - previous["Close"]) / previous["Close"] * 100),
-                "volume": int(latest["Volume"]) if not pd.isna(latest["Volume"]) else 0,
-                "high": float(latest["High"]),
-                "low": float(latest["Low"]),
-                "open": float(latest["Open"]),
-                "previousClose": float(previous["Close"]),
-                "marketCap": info.get("marketCap"),
-                "timestamp": datetime.now().isoformat(),
-                "source": "yfinance"
-            }
+            quote = self._build_quote(symbol, hist, utc_now_iso())
+            quote["name"] = info.get("longName") or info.get("shortName") or symbol
+            quote["marketCap"] = info.get("marketCap")
             
             return quote
             
@@ -55,66 +263,58 @@ class YFinanceCollector:
         """Get quotes for multiple symbols efficiently"""
         quotes = []
         
-        try:
-            # Use yfinance bulk download for efficiency
-            tickers = yf.Tickers(' '.join(symbols))
-            
-            for symbol in symbols:
-                try:
-                    ticker = tickers.tickers[symbol]
-                    info = ticker.info
-                    hist = ticker.history(period="2d")
-                    
-                    if not hist.empty:
-                        latest = hist.iloc[-1]
-                        previous = hist.iloc[-2] if len(hist) >= 2 else latest
-                        
-                        quote = {
-                            "symbol": symbol.upper(),
-                            "name": info.get("longName", info.get("shortName", symbol)),
-                            "price": float(latest["Close"]),
-                            "change": float(latest["Close"] - previous["Close"]),
-                            "changePercent": float((latest["Close"] - previous["Close"]) / previous["Close"] * 100),
-                            "volume": int(latest["Volume"]) if not pd.isna(latest["Volume"]) else 0,
-                            "high": float(latest["High"]),
-                            "low": float(latest["Low"]),
-                            "open": float(latest["Open"]),
-                            "previousClose": float(previous["Close"]),
-                            "marketCap": info.get("marketCap"),
-                            "timestamp": datetime.now().isoformat(),
-                            "source": "yfinance"
-                        }
-                        quotes.append(quote)
-                    else:
-                        quotes.append({"error": "No data found", "symbol": symbol})
-                        
-                except Exception as e:
-                    quotes.append({"error": str(e), "symbol": symbol})
+        # One v7 quote request per QUOTE_BATCH_SIZE symbols instead of one call per ticker;
+        # a failed chunk only marks its own symbols as errors
+        results = {}
+        errors = {}
+        for start in range(0, len(symbols), QUOTE_BATCH_SIZE):
+            chunk = symbols[start:start + QUOTE_BATCH_SIZE]
+            try:
+                for result in self._quote_batch(chunk):
+                    results[str(result.get("symbol", "")).upper()] = result
+            except Exception as e:
+                for symbol in chunk:
+                    errors[symbol.upper()] = f"Bulk fetch failed: {str(e)}"
+        # One snapshot time shared by every quote in the batch
+        now_iso = utc_now_iso()
+        
+        for symbol in symbols:
+            result = results.get(symbol.upper())
+            if result is None or result.get("regularMarketPrice") is None:
+                quotes.append({"error": errors.get(symbol.upper(), "No data found"), "symbol": symbol})
+                continue
             
-        except Exception as e:
-            return [{"error": f"Bulk fetch failed: {str(e)}"}]
+            quotes.append({
+                "symbol": symbol.upper(),
+                "name": result.get("longName") or result.get("shortName") or symbol,
+                "price": result["regularMarketPrice"],
+                "change": result.get("regularMarketChange", 0.0),
+                "changePercent": result.get("regularMarketChangePercent", 0.0),
+                "volume": result.get("regularMarketVolume") or 0,
+                "high": result.get("regularMarketDayHigh"),
+                "low": result.get("regularMarketDayLow"),
+                "open": result.get("regularMarketOpen"),
+                "previousClose": result.get("regularMarketPreviousClose"),
+                "marketCap": result.get("marketCap"),
+                "timestamp": now_iso,
+                "source": "yfinance"
+            })
         
         return quotes
     
-    def get_historical_data(self, symbol: str, period: str = "1y") -> Dict[str, Any]:
-        """Get historical data for a symbol"""
+    def _fetch_historical_data(self, symbol: str, period: str = "1y") -> Dict[str, Any]:
+        """Fetch historical data for a symbol from Yahoo"""
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
+            hist = self._get_history(symbol, period)
             
             if hist.empty:
                 raise ValueError(f"No historical data found for {symbol}")
             
-            data_points = []
-            for date, row in hist.iterrows():
-                data_points.append({
-                    "date": date.strftime("%Y-%m-%d"),
-                    "open": float(row["Open"]),
-                    "high": float(row["High"]),
-                    "low": float(row["Low"]),
-                    "close": float(row["Close"]),
-                    "volume": int(row["Volume"]) if not pd.isna(row["Volume"]) else 0
-                })
+            # Build all rows in one vectorized pass instead of iterrows()
+            frame = hist[["Open", "High", "Low", "Close"]].astype("float64").rename(columns=str.lower)
+            frame["volume"] = hist["Volume"].fillna(0).astype("int64")
+            frame.insert(0, "date", hist.index.strftime("%Y-%m-%d"))
+            data_points = frame.to_dict(orient="records")
             
             return {
                 "symbol": symbol.upper(),
@@ -127,11 +327,10 @@ class YFinanceCollector:
         except Exception as e:
             return {"error": str(e), "symbol": symbol}
     
-    def get_company_info(self, symbol: str) -> Dict[str, Any]:
-        """Get fundamental company information"""
+    def _fetch_company_info(self, symbol: str) -> Dict[str, Any]:
+        """Fetch fundamental company information from Yahoo"""
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            info = self._quote_summary(symbol, FUNDAMENTALS_MODULES)
             
             # Extract key fundamental metrics
             fundamentals = {
@@ -160,7 +359,7 @@ class YFinanceCollector:
                 "payoutRatio": info.get("payoutRatio"),
                 "sector": info.get("sector"),
                 "industry": info.get("industry"),
-                "lastUpdated": datetime.now().isoformat(),
+                "lastUpdated": utc_now_iso(),
                 "source": "yfinance"
             }
             
@@ -169,34 +368,125 @@ class YFinanceCollector:
         except Exception as e:
             return {"error": str(e), "symbol": symbol}
 
+def run_batch(collector: YFinanceCollector, requests_list: List[Dict[str, Any]]) -> List[Any]:
+    """Run a list of {action, symbols, period} requests, coalescing all quotes into one bulk fetch"""
+    quote_symbols = []
+    for req in requests_list:
+        if req.get("action") in ("quote", "quotes"):
+            for symbol in req.get("symbols") or []:
+                if symbol not in quote_symbols:
+                    quote_symbols.append(symbol)
+    
+    quotes_by_symbol = {}
+    if quote_symbols:
+        # get_multiple_quotes returns one entry (quote or per-symbol error) for every symbol
+        quotes_by_symbol = {
+            str(quote.get("symbol", "")).upper(): quote
+            for quote in collector.get_multiple_quotes(quote_symbols)
+        }
+    
+    results = []
+    for req in requests_list:
+        action = req.get("action")
+        symbols = req.get("symbols") or []
+        if action == "quote":
+            results.append(quotes_by_symbol.get(symbols[0].upper()) if symbols else {"error": "No symbols provided"})
+        elif action == "quotes":
+            results.append([quotes_by_symbol.get(symbol.upper()) for symbol in symbols])
+        else:
+            results.append(dispatch(collector, req))
+    return results
+
+def dispatch(collector: YFinanceCollector, req: Dict[str, Any]) -> Any:
+    """Run a single collector request"""
+    action = req.get("action")
+    symbols = req.get("symbols") or []
+    
+    try:
+        if action == "batch":
+            return run_batch(collector, req.get("requests") or [])
+        if not symbols:
+            return {"error": "No symbols provided", "action": action}
+        if action == "quote":
+            return collector.get_quote(symbols[0])
+        elif action == "quotes":
+            return collector.get_multiple_quotes(symbols)
+        elif action == "historical":
+            return collector.get_historical_data(symbols[0], req.get("period", "1y"))
+        elif action == "fundamentals":
+            return collector.get_company_info(symbols[0])
+        return {"error": f"Unsupported action: {action}", "action": action}
+    except Exception as e:
+        return {"error": str(e), "action": action, "symbols": symbols}
+
+def handle_request_line(collector: YFinanceCollector, line: str) -> str:
+    """Answer one daemon request line; never raises so one bad request can't kill the worker"""
+    req_id = None
+    try:
+        req = loads(line)
+        if not isinstance(req, dict):
+            raise ValueError("request must be a JSON object")
+        req_id = req.get("id")
+        return dumps({"id": req_id, "result": dispatch(collector, req)})
+    except Exception as e:
+        try:
+            return dumps({"id": req_id, "result": {"error": f"Invalid request: {str(e)}"}})
+        except Exception:
+            return dumps({"id": None, "result": {"error": f"Invalid request: {str(e)}"}})
+
+def run_daemon(workers: int = 8):
+    """Serve newline-delimited JSON requests from stdin until EOF.
+    
+    Each request is {"id", "action", "symbols", "period"} (or {"id", "action": "batch",
+    "requests": [...]}) and is answered with one {"id", "result"} line on stdout. Requests
+    are served concurrently by a thread pool, each thread with its own collector, so
+    responses may arrive out of order. Direct Yahoo calls use the thread's own session;
+    yfinance calls share yfinance's global session and are serialized by YFINANCE_LOCK.
+    """
+    local = threading.local()
+    write_lock = threading.Lock()
+    
+    def serve(line: str):
+        if not hasattr(local, "collector"):
+            local.collector = YFinanceCollector()
+        response = handle_request_line(local.collector, line)
+        with write_lock:
+            sys.stdout.write(response + "\n")
+            sys.stdout.flush()
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for line in sys.stdin:
+            line = line.strip()
+            if line:
+                executor.submit(serve, line)
+
 def main():
     parser = argparse.ArgumentParser(description="yfinance Data Collector")
-    parser.add_argument("action", choices=["quote", "quotes", "historical", "fundamentals"], 
+    parser.add_argument("action", nargs="?", choices=["quote", "quotes", "historical", "fundamentals"], 
                        help="Action to perform")
-    parser.add_argument("--symbols", nargs="+", required=True, 
+    parser.add_argument("--symbols", nargs="+", 
                        help="Stock symbols to fetch")
     parser.add_argument("--period", default="1y", 
                        help="Period for historical data (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)")
+    parser.add_argument("--daemon", action="store_true",
+                       help="Keep running and answer newline-delimited JSON requests from stdin")
+    parser.add_argument("--workers", type=int, default=8,
+                       help="Number of requests served concurrently in daemon mode")
     
     args = parser.parse_args()
+    if not args.daemon and (not args.action or not args.symbols):
+        parser.error("action and --symbols are required unless --daemon is set")
+    
+    if args.daemon:
+        run_daemon(args.workers)
+        return
     
     collector = YFinanceCollector()
     
-    try:
-        if args.action == "quote":
-            result = collector.get_quote(args.symbols[0])
-        elif args.action == "quotes":
-            result = collector.get_multiple_quotes(args.symbols)
-        elif args.action == "historical":
-            result = collector.get_historical_data(args.symbols[0], args.period)
-        elif args.action == "fundamentals":
-            result = collector.get_company_info(args.symbols[0])
-        
-        print(json.dumps(result, indent=2))
-        
-    except Exception as e:
-        error_result = {"error": str(e), "action": args.action, "symbols": args.symbols}
-        print(json.dumps(error_result, indent=2))
+    result = dispatch(collector, {"action": args.action, "symbols": args.symbols, "period": args.period})
+    print(dumps(result, indent=True))
+    
+    if isinstance(result, dict) and "error" in result and "action" in result:
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -391,6 +391,14 @@ const gracefulShutdown = async (signal: string) => {
     logger.error('Error stopping scheduler', e)
   }
 
+  // Stop the long-lived yfinance worker
+  try {
+    dataCollectionService.shutdown()
+    logger.info('yfinance worker stopped')
+  } catch (e) {
+    logger.error('Error stopping yfinance worker', e)
+  }
+
   // Add any other cleanup logic here
 
   process.exit(0)
@@ -1,4 +1,5 @@
-import { spawn } from 'child_process'
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process'
+import { createInterface } from 'readline'
 import path from 'path'
 import { createLogger } from '../utils/logger'
 
@@ -41,46 +42,116 @@ interface HistoricalData {
   source?: string
 }
 
+interface PythonRequest {
+  action: string
+  symbols?: string[]
+  period?: string
+  query?: string
+  requests?: PythonRequest[]
+}
+
+interface PendingRequest {
+  resolve: (value: any) => void
+  reject: (reason: Error) => void
+  timer: NodeJS.Timeout
+}
+
+const REQUEST_TIMEOUT_MS = 60000
+
 export class YFinanceProvider {
   private pythonScript: string
+  private python: ChildProcessWithoutNullStreams | null = null
+  private pending = new Map<number, PendingRequest>()
+  private nextRequestId = 1
 
   constructor() {
     this.pythonScript = path.join(__dirname, '../../scripts/yfinance_collector.py')
   }
 
-  private async executePythonScript(args: string[]): Promise<any> {
-    return new Promise((resolve, reject) => {
-      const python = spawn('python3', [this.pythonScript, ...args])
-      let output = ''
-      let errorOutput = ''
+  private getPythonProcess(): ChildProcessWithoutNullStreams {
+    if (this.python) {
+      return this.python
+    }
 
-      python.stdout.on('data', (data) => {
-        output += data.toString()
-      })
+    // One long-lived worker keeps the interpreter, imports, HTTP session and cache warm
+    const python = spawn('python3', [this.pythonScript, '--daemon'])
+    let errorOutput = ''
 
-      python.stderr.on('data', (data) => {
-        errorOutput += data.toString()
-      })
+    createInterface({ input: python.stdout }).on('line', (line) => {
+      if (!line.trim()) return
 
-      python.on('close', (code) => {
-        if (code === 0) {
-          try {
-            const result = JSON.parse(output)
-            resolve(result)
-          } catch (error) {
-            reject(new Error(`Failed to parse JSON output: ${error}`))
-          }
-        } else {
-          reject(new Error(`Python script failed (code ${code}): ${errorOutput}`))
-        }
-      })
+      let response: any
+      try {
+        response = JSON.parse(line)
+      } catch (error) {
+        logger.warn(`Failed to parse JSON output from yfinance worker: ${error}`)
+        return
+      }
 
-      python.on('error', (error) => {
-        reject(new Error(`Failed to spawn Python process: ${error.message}`))
-      })
+      const request = this.pending.get(response.id)
+      if (!request) return
+
+      clearTimeout(request.timer)
+      this.pending.delete(response.id)
+      request.resolve(response.result)
+    })
+
+    python.stdin.on('error', (error) => {
+      logger.warn(`yfinance worker stdin error: ${error.message}`)
+    })
+
+    python.stderr.on('data', (data) => {
+      errorOutput = (errorOutput + data.toString()).slice(-4000)
+    })
+
+    python.on('close', (code) => {
+      if (this.python === python) {
+        this.python = null
+      }
+      this.rejectAllPending(new Error(`Python script failed (code ${code}): ${errorOutput}`))
+    })
+
+    python.on('error', (error) => {
+      if (this.python === python) {
+        this.python = null
+      }
+      this.rejectAllPending(new Error(`Failed to spawn Python process: ${error.message}`))
+    })
+
+    this.python = python
+    return python
+  }
+
+  private rejectAllPending(error: Error): void {
+    for (const request of this.pending.values()) {
+      clearTimeout(request.timer)
+      request.reject(error)
+    }
+    this.pending.clear()
+  }
+
+  private async executePythonRequest(request: PythonRequest): Promise<any> {
+    const python = this.getPythonProcess()
+    const id = this.nextRequestId++
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id)
+        reject(new Error(`Python request ${request.action} timed out after ${REQUEST_TIMEOUT_MS}ms`))
+      }, REQUEST_TIMEOUT_MS)
+
+      this.pending.set(id, { resolve, reject, timer })
+      python.stdin.write(JSON.stringify({ id, ...request }) + '\n')
     })
   }
 
+  shutdown(): void {
+    if (this.python) {
+      this.python.stdin.end()
+      this.python = null
+    }
+  }
+
   private formatSymbolForYahoo(symbol: string): string {
     // Handle exchange-specific formatting
     if (!symbol.includes('.')) {
@@ -127,7 +198,7 @@ export class YFinanceProvider {
     const currency = exchange === 'NSE' ? 'INR' : 'USD'
     
     try {
-      const result = await this.executePythonScript(['quote', '--symbols', yahooSymbol])
+      const result = await this.executePythonRequest({ action: 'quote', symbols: [yahooSymbol] })
       
       if (result.error) {
         throw new Error(result.error)
@@ -169,7 +240,7 @@ export class YFinanceProvider {
     
     try {
       logger.info(`Fetching quotes for ${symbols.length} symbols using yfinance`)
-      const result = await this.executePythonScript(['quotes', '--symbols', ...yahooSymbols])
+      const result = await this.executePythonRequest({ action: 'quotes', symbols: yahooSymbols })
       
       // Debug logging to understand the response format
       logger.debug(`Python script response:`, { 
@@ -230,11 +301,11 @@ export class YFinanceProvider {
     try {
       logger.info(`Fetching historical data for ${symbol} (${period}) using yfinance`)
       
-      const result = await this.executePythonScript([
-        'historical',
-        '--symbols', symbol,
-        '--period', period
-      ])
+      const result = await this.executePythonRequest({
+        action: 'historical',
+        symbols: [symbol],
+        period
+      })
 
       if (result.error) {
         throw new Error(result.error)
@@ -253,10 +324,10 @@ export class YFinanceProvider {
     try {
       logger.info(`Fetching fundamental data for ${symbol} using yfinance`)
       
-      const result = await this.executePythonScript([
-        'fundamentals',
-        '--symbols', symbol
-      ])
+      const result = await this.executePythonRequest({
+        action: 'fundamentals',
+        symbols: [symbol]
+      })
 
       if (result.error) {
         throw new Error(result.error)
@@ -288,7 +359,7 @@ export class YFinanceProvider {
     
     // Strategy 2: Enhanced company name search using Python script
     try {
-      const searchResults = await this.executePythonScript(['search', '--query', query])
+      const searchResults = await this.executePythonRequest({ action: 'search', query })
       
       if (searchResults.error) {
         logger.warn(`Python search failed: ${searchResults.error}`)
@@ -680,6 +680,10 @@ export class DataCollectionService {
     return new Promise(resolve => setTimeout(resolve, ms))
   }
 
+  shutdown(): void {
+    this.yfinance.shutdown()
+  }
+
   async getProviderStatus(): Promise<any> {
     return {
       yfinance: await this.yfinance.getServiceStatus(),